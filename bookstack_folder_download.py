@@ -8,6 +8,8 @@ Mirrors the structure used by bookstack_folder_sync.py, but in reverse:
 - First-level chapters become directories; their pages become Markdown files inside
 - Two-digit (at least) numeric prefixes reflect item priority for ordering
 - Preserves page & chapter title casing in names (strip prefix on upload)
+- Page bodies come from BookStack's Markdown export endpoint; older servers
+  fall back to the page's stored markdown or a local HTML->Markdown conversion
 
 Env (via .env or environment):
   BOOKSTACK_BASE_URL
@@ -18,13 +20,19 @@ Optional:
   OUTPUT_DIR=/path/to/output     (default: ./<BOOKSTACK_BOOK_NAME> next to script)
   BOOKSTACK_INSECURE=1           (disable TLS verify & suppress warnings)
   BOOKSTACK_CA_CERT=/path/to/ca.pem
+  BOOKSTACK_CONCURRENCY=8        (number of pages fetched in parallel)
 """
 
 import os
 import re
 import sys
+import json
+import hashlib
+import tempfile
+from importlib import metadata
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # --- Load environment from .env if present (same behavior as sync) ---
 try:
@@ -48,10 +56,21 @@ except ImportError:
     subprocess.check_call([_sys.executable, "-m", "pip", "install", "requests"])
     import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses JSON in native code; the stdlib parser is the fallback.
+# Both accept the raw response bytes.
+try:
+    from orjson import loads as json_loads  # type: ignore
+except ImportError:
+    from json import loads as json_loads
+
 
 # --------------------- Helpers ---------------------
 
-INVALID_FS_CHARS = re.compile(r"[\\/:*?\"<>|]")
+# Characters illegal in Windows/macOS/Linux file names -> underscore
+INVALID_FS_TRANS = str.maketrans({c: "_" for c in '\\/:*?"<>|'})
 
 def getenv_required(key: str) -> str:
     v = os.getenv(key)
@@ -67,8 +86,8 @@ def sanitize_name(name: str) -> str:
     - Collapse whitespace
     - Trim trailing dots/spaces (Windows limitation)
     """
-    name = INVALID_FS_CHARS.sub("_", name)
-    name = re.sub(r"\s+", " ", name).strip()
+    name = name.translate(INVALID_FS_TRANS)
+    name = " ".join(name.split())
     # Avoid problematic trailing characters on Windows
     name = name.rstrip(" .")
     if not name:
@@ -89,71 +108,130 @@ def prefixed_name(priority: Optional[int], title: str) -> str:
         n = n.zfill(2)
     return f"{n} {safe}"
 
-def write_text_if_changed(path: Path, content: str) -> str:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if path.exists():
-        try:
-            current = path.read_text(encoding="utf-8")
-            if current == content:
-                return "no-change"
-        except Exception:
-            pass
-    path.write_text(content, encoding="utf-8")
-    return "written" if path.exists() else "error"
+_PROBE_SIZE = 4096
+
+def _file_has_bytes(path: Path, data: bytes) -> bool:
+    """
+    True if the file holds exactly `data`. Cheap checks first: size, then the
+    first and last 4 KiB, and only then the full contents.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size != len(data):
+            return False
+        if len(data) > 2 * _PROBE_SIZE:
+            if f.read(_PROBE_SIZE) != data[:_PROBE_SIZE]:
+                return False
+            f.seek(-_PROBE_SIZE, os.SEEK_END)
+            if f.read(_PROBE_SIZE) != data[-_PROBE_SIZE:]:
+                return False
+            f.seek(0)
+        return f.read() == data
+
+def _files_equal(a: Path, b: Path) -> bool:
+    try:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            ca = fa.read(64 * 1024)
+            if ca != fb.read(64 * 1024):
+                return False
+            if not ca:
+                return True
+
+# mkstemp creates files as 0600; give temp files the mode open() would under this umask
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+_NEW_FILE_MODE = 0o666 & ~_UMASK
+
+def open_temp_for(path: Path):
+    """
+    Create a uniquely named temp file next to `path`; returns (binary file, temp path).
+    Pages whose names sanitize to the same file are written concurrently, so each
+    writer needs its own temp file; the last os.replace wins, as a serial run would.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    os.chmod(tmp, _NEW_FILE_MODE)
+    return os.fdopen(fd, "wb"), Path(tmp)
 
+def replace_if_changed(tmp: Path, path: Path) -> str:
+    """
+    Move a freshly written temp file over `path`, or discard it if `path`
+    already has identical contents.
+    """
+    if _files_equal(tmp, path):
+        tmp.unlink()
+        return "no-change"
+    os.replace(tmp, path)
+    return "written"
 
-# --------------------- HTML -> Markdown ---------------------
+def priority_name_key(item: Dict[str, Any]) -> Tuple[int, str]:
+    """
+    Sort key for chapters/pages: priority, then case-insensitive name.
+    list.sort() computes it once per item (not per comparison).
+    """
+    return (item.get("priority") or 0, (item.get("name") or "").lower())
 
-def _try_markdownify(html: str) -> Optional[str]:
+def write_text_if_changed(path: Path, content: str) -> str:
+    """
+    Write UTF-8 content unless the file already holds exactly these bytes.
+    Raw bytes are compared (no decode, no newline translation). The content
+    is encoded once and written to a temp file that atomically replaces the
+    target, so an interrupted run never leaves a half-written page behind.
+    """
+    data = content.encode("utf-8")
     try:
-        from markdownify import markdownify as md  # type: ignore
-    except Exception:
-        # Attempt install on the fly; ignore failure silently
-        try:
-            import subprocess, sys as _sys
-            subprocess.check_call([_sys.executable, "-m", "pip", "install", "markdownify"])
-            from markdownify import markdownify as md  # type: ignore
-        except Exception:
-            return None
+        if _file_has_bytes(path, data):
+            return "no-change"
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
+    out, tmp = open_temp_for(path)
     try:
-        # Use ATX-style headings (#, ##), fenced code blocks, dash bullets
-        text = md(html, heading_style="ATX")
-        return text
-    except Exception:
-        return None
+        with out:
+            out.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return "written"
 
-def _try_html2text(html: str) -> Optional[str]:
-    try:
-        import html2text  # type: ignore
-    except Exception:
-        try:
-            import subprocess, sys as _sys
-            subprocess.check_call([_sys.executable, "-m", "pip", "install", "html2text"])
-            import html2text  # type: ignore
-        except Exception:
-            return None
+
+# --------------------- HTML -> Markdown ---------------------
+
+# markdownify (install if missing); one converter instance reused for every page.
+# ATX-style headings (#, ##), fenced code blocks, dash bullets
+try:
+    from markdownify import MarkdownConverter, ATX  # type: ignore
+except Exception:
     try:
-        h = html2text.HTML2Text()
-        h.body_width = 0            # do not wrap lines
-        h.unicode_snob = True
-        h.ignore_images = False
-        h.ignore_emphasis = False
-        h.ignore_links = False
-        h.protect_links = True
-        h.single_line_break = True
-        text = h.handle(html)
-        return text
+        import subprocess, sys as _sys
+        subprocess.check_call([_sys.executable, "-m", "pip", "install", "markdownify"])
+        from markdownify import MarkdownConverter, ATX  # type: ignore
     except Exception:
-        return None
+        MarkdownConverter = None
+
+_MD_CONV = MarkdownConverter(heading_style=ATX) if MarkdownConverter else None
 
 _HTML_TAG_RE = re.compile(r"<[^>]+>")
+_BR_RE = re.compile(r"<\s*br\s*/?\s*>", re.I)
+_P_CLOSE_RE = re.compile(r"</\s*p\s*>", re.I)
+_P_OPEN_RE = re.compile(r"<\s*p[^>]*>", re.I)
+_CRLF_RE = re.compile(r"\r\n|\r")
+_MULTI_NL_RE = re.compile(r"\n\n\n+")
+_TRAILING_WS_RE = re.compile(r"\s+$", re.M)
+_CALLOUT_LINE_RE = re.compile(r"^\s*>\s*\[![A-Za-z]+\]")
+_HAS_CALLOUT_RE = re.compile(r"callout", re.I)
 
 def _basic_strip_html(html: str) -> str:
     # Very basic fallback: remove tags, keep text; not ideal but better than raw HTML
     # Convert <br> and <p> to line breaks first
-    s = re.sub(r"(?i)<\s*br\s*/?\s*>", "\n", html)
-    s = re.sub(r"(?i)</\s*p\s*>", "\n\n", s)
-    s = re.sub(r"(?i)<\s*p[^>]*>", "", s)
+    s = _BR_RE.sub("\n", html)
+    s = _P_CLOSE_RE.sub("\n\n", s)
+    s = _P_OPEN_RE.sub("", s)
     # Remove remaining tags
     s = _HTML_TAG_RE.sub("", s)
     # Unescape basic entities
@@ -163,48 +241,81 @@ def _basic_strip_html(html: str) -> str:
     except Exception:
         pass
     # Normalize whitespace
-    s = re.sub(r"\r\n|\r", "\n", s)
-    s = re.sub(r"\n\n\n+", "\n\n", s)
+    s = _CRLF_RE.sub("\n", s)
+    s = _MULTI_NL_RE.sub("\n\n", s)
     return s.strip() + "\n"
 
-def _preprocess_callouts(html: str) -> str:
+# selectolax (lexbor) is a native HTML parser; BeautifulSoup is the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except ImportError:
+    LexborHTMLParser = None
+
+# lxml is a C parser and much faster than the pure-Python "html.parser"
+try:
+    import lxml  # type: ignore
+    _SOUP_PARSER = "lxml"
+except ImportError:
+    _SOUP_PARSER = "html.parser"
+
+def _classify_callout(classes: List[str]) -> str:
+    priority = [
+        ("danger", "DANGER"),
+        ("warning", "WARNING"),
+        ("success", "SUCCESS"),
+        ("tip", "TIP"),
+        ("info", "INFO"),
+        ("note", "NOTE"),
+    ]
+    lc = [c.lower() for c in classes]
+    for k, v in priority:
+        if k in lc:
+            return v
+    return "INFO"
+
+def _preprocess_callouts_lexbor(html: str) -> str:
+    tree = LexborHTMLParser(html)
+    # Page HTML is a fragment (quirks mode), so ".callout" matches any case.
+    # Innermost first, so nested callouts are wrapped before their parent is copied.
+    for node in reversed(tree.css(".callout")):
+        ctype = _classify_callout((node.attributes.get("class") or "").split())
+        wrapper = LexborHTMLParser(f"<blockquote><p>[!{ctype}]</p>{node.inner_html or ''}</blockquote>")
+        node.replace_with(wrapper.body.child)
+    return tree.body.inner_html if tree.body is not None else html
+
+# BeautifulSoup class once loaded; False once it proved unavailable
+_bs4_class: Any = None
+
+def _load_bs4() -> Any:
     """
-    Detect elements with class "callout" and wrap their content in
-    a <blockquote><p>[!TYPE]</p>…</blockquote> structure so downstream
-    HTML->Markdown converters render proper admonitions, preserving callouts.
+    Import (installing on first use if needed) BeautifulSoup once per run.
     """
-    try:
-        from bs4 import BeautifulSoup  # type: ignore
-    except Exception:
+    global _bs4_class
+    if _bs4_class is None:
         try:
-            import subprocess, sys as _sys
-            subprocess.check_call([_sys.executable, "-m", "pip", "install", "beautifulsoup4"])
             from bs4 import BeautifulSoup  # type: ignore
         except Exception:
-            # If BS4 not available, return original HTML
-            return html
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    def classify_callout(classes: List[str]) -> str:
-        priority = [
-            ("danger", "DANGER"),
-            ("warning", "WARNING"),
-            ("success", "SUCCESS"),
-            ("tip", "TIP"),
-            ("info", "INFO"),
-            ("note", "NOTE"),
-        ]
-        lc = [c.lower() for c in classes]
-        for k, v in priority:
-            if k in lc:
-                return v
-        return "INFO"
-
-    callout_nodes = soup.find_all(lambda tag: isinstance(tag.get("class"), list) and any(c.lower() == "callout" for c in tag.get("class", [])))
+            try:
+                import subprocess, sys as _sys
+                subprocess.check_call([_sys.executable, "-m", "pip", "install", "beautifulsoup4"])
+                from bs4 import BeautifulSoup  # type: ignore
+            except Exception:
+                BeautifulSoup = False
+        _bs4_class = BeautifulSoup
+    return _bs4_class
+
+def _preprocess_callouts_bs4(html: str) -> str:
+    BeautifulSoup = _load_bs4()
+    if not BeautifulSoup:
+        # If BS4 not available, return original HTML
+        return html
+
+    soup = BeautifulSoup(html, _SOUP_PARSER)
+
+    # CSS class matching is case-sensitive; cover the spellings seen in practice
+    callout_nodes = soup.select(".callout, .Callout, .CALLOUT")
     for node in callout_nodes:
-        classes = node.get("class", [])
-        ctype = classify_callout(classes)
+        ctype = _classify_callout(node.get("class", []))
 
         # Create blockquote wrapper
         bq = soup.new_tag("blockquote")
@@ -221,84 +332,194 @@ def _preprocess_callouts(html: str) -> str:
 
     return str(soup)
 
-def html_to_markdown(html: str) -> str:
+def _preprocess_callouts(html: str) -> str:
     """
-    Convert HTML to Markdown using best-available method:
-      1) markdownify (best quality)
-      2) html2text (good quality)
-      3) basic tag stripping fallback
+    Detect elements with class "callout" and wrap their content in
+    a <blockquote><p>[!TYPE]</p>…</blockquote> structure so downstream
+    HTML->Markdown converters render proper admonitions, preserving callouts.
+    Uses selectolax when installed, BeautifulSoup otherwise.
+    """
+    # Most pages have no callouts: skip parsing (and the BS4 import) entirely
+    if not _HAS_CALLOUT_RE.search(html):
+        return html
+    if LexborHTMLParser is not None:
+        return _preprocess_callouts_lexbor(html)
+    return _preprocess_callouts_bs4(html)
+
+def _ensure_blankline_before_callouts(md_text: str) -> str:
+    # No "[!" means no callout header anywhere: skip the per-line scan,
+    # but keep the same line-ending normalisation as the full path
+    if "[!" not in md_text:
+        return "\n".join(md_text.splitlines()).rstrip() + "\n"
+    lines = md_text.splitlines()
+    out: List[str] = []
+    for line in lines:
+        stripped = line.lstrip()
+        # Cheap prefix test first; the regex only runs on quote lines
+        if stripped.startswith(">") and _CALLOUT_LINE_RE.match(stripped):
+            if out and out[-1].strip() != "":
+                out.append("")
+        out.append(line)
+    return "\n".join(out).rstrip() + "\n"
+
+def _convert_html_to_markdown(html: str) -> str:
+    """
+    Convert HTML to Markdown with markdownify, falling back to basic tag
+    stripping if it is unavailable or fails.
     Also performs light post-processing to reduce extra blank lines.
     """
     # Preprocess HTML to preserve callouts as admonition-style blockquotes
     html = _preprocess_callouts(html)
 
-    def _ensure_blankline_before_callouts(md_text: str) -> str:
-        lines = md_text.splitlines()
-        out: List[str] = []
-        callout_re = re.compile(r"^\s*>\s*\[![A-Za-z]+\]")
-        for line in lines:
-            if callout_re.match(line):
-                if out and out[-1].strip() != "":
-                    out.append("")
-            out.append(line)
-        return "\n".join(out).rstrip() + "\n"
-
-    for fn in (_try_markdownify, _try_html2text):
-        md = fn(html)
-        if isinstance(md, str) and md.strip():
-            # light normalization
-            md = re.sub(r"\s+$", "", md, flags=re.MULTILINE)
-            md = re.sub(r"\n\n\n+", "\n\n", md)
-            md = md.strip() + "\n"
-            md = _ensure_blankline_before_callouts(md)
-            return md
+    md: Optional[str] = None
+    if _MD_CONV is not None:
+        try:
+            md = _MD_CONV.convert(html)
+        except Exception:
+            md = None
+    if md and md.strip():
+        # light normalization
+        md = _TRAILING_WS_RE.sub("", md)
+        md = _MULTI_NL_RE.sub("\n\n", md)
+        md = md.strip() + "\n"
+        return _ensure_blankline_before_callouts(md)
     return _basic_strip_html(html)
 
 
+# Conversion results keyed by a hash of the page HTML. Persisted in the output
+# folder so re-running against an unchanged book skips conversion entirely.
+MD_CACHE_FILE = ".md_cache.json"
+MD_CACHE_VERSION = 3  # bump whenever conversion output changes
+
+_md_cache: Dict[str, str] = {}
+_md_cache_used: Dict[str, str] = {}
+
+def _html_key(html: str) -> str:
+    return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+def _dist_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "?"
+
+def _converter_id() -> str:
+    """
+    The conversion backends in use, with versions. Cached entries are only reused
+    when this matches, so installing or upgrading one converts the pages again.
+    """
+    parts = [f"markdownify {_dist_version('markdownify')}" if _MD_CONV is not None else "tag-strip"]
+    if LexborHTMLParser is not None:
+        parts.append(f"selectolax {_dist_version('selectolax')}")
+    else:
+        parts.append(f"beautifulsoup4 {_dist_version('beautifulsoup4')} ({_SOUP_PARSER})")
+    return ", ".join(parts)
+
+def load_md_cache(path: Path) -> None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    if not isinstance(data, dict) or data.get("version") != MD_CACHE_VERSION:
+        return
+    if data.get("converter") != _converter_id():
+        return
+    entries = data.get("entries")
+    if isinstance(entries, dict):
+        _md_cache.update({k: v for k, v in entries.items() if isinstance(v, str)})
+
+def save_md_cache(path: Path) -> None:
+    """
+    Persist only the entries used during this run so stale pages drop out.
+    """
+    data = {"version": MD_CACHE_VERSION, "converter": _converter_id(), "entries": _md_cache_used}
+    write_text_if_changed(path, json.dumps(data, ensure_ascii=False))
+
+def html_to_markdown(html: str) -> str:
+    """
+    Memoized wrapper around _convert_html_to_markdown (see MD_CACHE_FILE).
+    """
+    key = _html_key(html)
+    md = _md_cache.get(key)
+    if md is None:
+        md = _convert_html_to_markdown(html)
+        _md_cache[key] = md
+    _md_cache_used[key] = md
+    return md
+
+
 # --------------------- API Client ---------------------
 
 class BookStackClient:
-    def __init__(self, base_url: str, token_id: str, token_secret: str, verify=True, rate_limit_sleep: float = 0.5):
+    def __init__(self, base_url: str, token_id: str, token_secret: str, verify=True, rate_limit_sleep: float = 0.5, concurrency: int = 8):
         self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Token {token_id}:{token_secret}",
             "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
             "User-Agent": "BookStack-FolderDownload/1.0"
         })
         self.session.verify = verify
         self.rate_limit_sleep = rate_limit_sleep
+        # Pool sized for concurrent page downloads; urllib3 retries 429/5xx with
+        # exponential backoff (honouring Retry-After) and hands back the last response
+        retry = Retry(
+            total=5,
+            backoff_factor=rate_limit_sleep,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.export_available = True
+        self.export_confirmed = False  # set once any page export has succeeded
+
+    def _send(self, method: str, path: str, *, params: Dict[str, Any] = None, stream: bool = False) -> requests.Response:
+        # Retries on 429/5xx happen in the mounted adapter
+        return self.session.request(method, f"{self.base_url}{path}", params=params, timeout=60, stream=stream)
 
     def _request(self, method: str, path: str, *, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        import time as _time
-        url = f"{self.base_url}{path}"
-        for attempt in range(5):
-            resp = self.session.request(method, url, params=params, timeout=60)
-            if resp.status_code == 429:
-                _time.sleep(self.rate_limit_sleep * (attempt + 1))
-                continue
-            if 200 <= resp.status_code < 300:
-                return resp.json() if resp.text.strip() else {}
-            if 500 <= resp.status_code < 600 and attempt < 4:
-                _time.sleep(self.rate_limit_sleep * (attempt + 1))
-                continue
-            raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
-        raise RuntimeError(f"{method} {path} failed after retries")
+        resp = self._send(method, path, params=params)
+        if 200 <= resp.status_code < 300:
+            # Check the raw bytes; resp.text would decode the whole body a second time
+            body = resp.content
+            return json_loads(body) if body and not body.isspace() else {}
+        raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
 
     # Pagination helper
     def _list_all(self, path: str, params: Optional[Dict[str, Any]] = None, count: int = 100) -> List[Dict[str, Any]]:
+        """
+        Fetch every item of a listing endpoint using count/offset paging.
+        The first response reports the total, so the remaining slices are
+        requested concurrently.
+        """
         params = dict(params or {})
-        page = 1
-        items: List[Dict[str, Any]] = []
-        while True:
+
+        def fetch(offset: int) -> Dict[str, Any]:
             p = dict(params)
-            p.update({"count": count, "page": page})
-            j = self._request("GET", path, params=p)
-            data = j.get("data", [])
-            items.extend(data)
-            if len(data) < count or not j.get("next"):
-                break
-            page += 1
+            p.update({"count": count, "offset": offset})
+            return self._request("GET", path, params=p)
+
+        j = fetch(0)
+        data = j.get("data", [])
+        items: List[Dict[str, Any]] = list(data)
+        total = j.get("total")
+        if not isinstance(total, int):
+            # No total reported: walk the slices one by one
+            while len(data) == count:
+                data = fetch(len(items)).get("data", [])
+                items.extend(data)
+            return items
+
+        offsets = range(count, total, count)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=min(len(offsets), self.concurrency)) as ex:
+                for j in ex.map(fetch, offsets):
+                    items.extend(j.get("data", []))
         return items
 
     # Books
@@ -316,31 +537,116 @@ class BookStackClient:
             params={"filter[book_id]": book_id}
         )
         # sort by priority then name (case-insensitive)
-        items.sort(key=lambda c: (c.get("priority") or 0, (c.get("name") or "").lower()))
+        items.sort(key=priority_name_key)
         return items
 
     # Pages
-    def list_pages_root(self, book_id: int) -> List[Dict[str, Any]]:
-        items = self._list_all(
+    def list_all_pages(self, book_id: int) -> List[Dict[str, Any]]:
+        """
+        Every page in the book (root and chapter pages) in one paginated listing.
+        """
+        return self._list_all(
             "/api/pages",
             params={"filter[book_id]": book_id}
         )
-        # Keep only those not in a chapter (chapter_id is null/None)
-        root_items = [p for p in items if not p.get("chapter_id")]
-        root_items.sort(key=lambda p: (p.get("priority") or 0, (p.get("name") or "").lower()))
-        return root_items
-
-    def list_pages_in_chapter(self, chapter_id: int) -> List[Dict[str, Any]]:
-        items = self._list_all(
-            "/api/pages",
-            params={"filter[chapter_id]": chapter_id}
-        )
-        items.sort(key=lambda p: (p.get("priority") or 0, (p.get("name") or "").lower()))
-        return items
 
     def get_page(self, page_id: int) -> Dict[str, Any]:
         return self._request("GET", f"/api/pages/{page_id}")
 
+    def open_page_markdown(self, page_id: int) -> Optional[requests.Response]:
+        """
+        Open a streamed response for the page's server-rendered Markdown export;
+        the caller reads it with iter_content() and closes it.
+        Returns None when the export is unavailable for this page, so the caller
+        falls back for it. The endpoint is given up on for the rest of the run
+        only on a 403 (token lacks export permission) or on a 404 before any
+        export has worked (older BookStack versions). A later 404 is just a page
+        deleted or hidden since the listing, and the export stays in use for the
+        other pages so they all come out in the server's Markdown dialect.
+        """
+        if not self.export_available:
+            return None
+        path = f"/api/pages/{page_id}/export/markdown"
+        resp = self._send("GET", path, stream=True)
+        if resp.status_code in (403, 404):
+            resp.close()
+            if resp.status_code == 403 or not self.export_confirmed:
+                self.export_available = False
+            return None
+        if not 200 <= resp.status_code < 300:
+            with resp:
+                raise RuntimeError(f"GET {path} failed [{resp.status_code}]: {resp.text}")
+        self.export_confirmed = True
+        return resp
+
+
+# --------------------- Page download ---------------------
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+def export_page_to_file(client: BookStackClient, page: Dict[str, Any], file_path: Path) -> Optional[str]:
+    """
+    Stream the page's Markdown export into file_path without holding the body
+    in memory. Returns the write status, or None if the export is unavailable.
+    """
+    resp = client.open_page_markdown(page["id"])
+    if resp is None:
+        return None
+    # The export prepends "# <page name>" which is not part of the page body
+    heading = f"# {page.get('name') or ''}\n\n".encode("utf-8")
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    out, tmp = open_temp_for(file_path)
+    try:
+        with resp, out:
+            head = b""  # held back until we know whether it is the heading
+            for chunk in resp.iter_content(chunk_size=EXPORT_CHUNK_SIZE):
+                if head is not None:
+                    head += chunk
+                    if len(head) < len(heading) and heading.startswith(head):
+                        continue
+                    chunk = head[len(heading):] if head.startswith(heading) else head
+                    head = None
+                out.write(chunk)
+            if head is not None:
+                out.write(head)
+        return replace_if_changed(tmp, file_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def fetch_page_markdown(client: BookStackClient, page: Dict[str, Any]) -> str:
+    """
+    Page body from the page JSON, converting HTML locally when no markdown is stored.
+    """
+    full = client.get_page(page["id"])  # get markdown/html
+    md = full.get("markdown")
+    if isinstance(md, str) and md.strip():
+        return md
+    html = (full.get("html") or "").strip()
+    return html_to_markdown(html) if html else ""
+
+def download_page(client: BookStackClient, page: Dict[str, Any], file_path: Path) -> str:
+    status = export_page_to_file(client, page, file_path)
+    if status is not None:
+        return status
+    return write_text_if_changed(file_path, fetch_page_markdown(client, page))
+
+def submit_page_download(executor: ThreadPoolExecutor, client: BookStackClient, page: Dict[str, Any], folder: Path) -> Tuple[str, Future]:
+    """
+    Queue a page for download into `folder`. Returns (filename, future of write status).
+    """
+    title = page.get("name") or f"Page-{page.get('id')}"
+    filename = prefixed_name(page.get("priority"), title) + ".md"
+    return filename, executor.submit(download_page, client, page, folder / filename)
+
+def report_downloads(jobs: List[Tuple[str, Future]], indent: str) -> None:
+    for filename, future in jobs:
+        status = future.result()
+        if status == "no-change":
+            print(f"{indent}[=] No change: {filename}")
+        else:
+            print(f"{indent}[+] Wrote: {filename}")
+
 
 # --------------------- Main Download ---------------------
 
@@ -370,7 +676,8 @@ def main():
     out_dir_env = os.getenv("OUTPUT_DIR", "").strip()
     out_root = Path(out_dir_env).expanduser().resolve() if out_dir_env else (script_dir / book_name).resolve()
 
-    client = BookStackClient(base_url, token_id, token_secret, verify=verify)
+    concurrency = max(1, int(os.getenv("BOOKSTACK_CONCURRENCY", "8")))
+    client = BookStackClient(base_url, token_id, token_secret, verify=verify, concurrency=concurrency)
 
     # Verify book exists
     book = client.find_book_exact(book_name)
@@ -381,59 +688,48 @@ def main():
     print(f"[=] Source book: {book_name} (id={book_id})")
     print(f"[=] Output folder: {out_root}")
 
-    # Root pages
-    root_pages = client.list_pages_root(book_id)
-    for p in root_pages:
-        title = p.get("name") or f"Page-{p.get('id')}"
-        prio = p.get("priority")
-        filename = prefixed_name(prio, title) + ".md"
-        file_path = out_root / filename
-
-        full = client.get_page(p["id"])  # get markdown/html
-        md = full.get("markdown")
-        content: str
-        if isinstance(md, str) and md.strip():
-            content = md
-        else:
-            html = (full.get("html") or "").strip()
-            content = html_to_markdown(html) if html else ""
-
-        status = write_text_if_changed(file_path, content)
-        if status == "no-change":
-            print(f"[=] No change: {filename}")
-        else:
-            print(f"[+] Wrote: {filename}")
-
-    # Chapters and their pages
-    chapters = client.list_chapters(book_id)
-    for ch in chapters:
-        ch_title = ch.get("name") or f"Chapter-{ch.get('id')}"
-        ch_prio = ch.get("priority")
-        ch_dir = out_root / prefixed_name(ch_prio, ch_title)
-        ch_dir.mkdir(parents=True, exist_ok=True)
-        print(f"[=] Chapter: {ch_dir.name}")
-
-        ch_pages = client.list_pages_in_chapter(ch["id"])
-        for p in ch_pages:
-            title = p.get("name") or f"Page-{p.get('id')}"
-            prio = p.get("priority")
-            filename = prefixed_name(prio, title) + ".md"
-            file_path = ch_dir / filename
-
-            full = client.get_page(p["id"])  # get markdown/html
-            md = full.get("markdown")
-            if isinstance(md, str) and md.strip():
-                content = md
-            else:
-                html = (full.get("html") or "").strip()
-                content = html_to_markdown(html) if html else ""
-
-            status = write_text_if_changed(file_path, content)
-            if status == "no-change":
-                print(f"    [=] No change: {filename}")
-            else:
-                print(f"    [+] Wrote: {filename}")
+    md_cache_path = out_root / MD_CACHE_FILE
+    load_md_cache(md_cache_path)
 
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            # Chapters and pages are independent listings: fetch them side by side
+            chapters_future = executor.submit(client.list_chapters, book_id)
+
+            # One listing for the whole book, bucketed by chapter (None = book root)
+            pages_by_chapter: Dict[Optional[int], List[Dict[str, Any]]] = {}
+            for p in client.list_all_pages(book_id):
+                pages_by_chapter.setdefault(p.get("chapter_id") or None, []).append(p)
+            for bucket in pages_by_chapter.values():
+                bucket.sort(key=priority_name_key)
+
+            # Root pages
+            root_pages = pages_by_chapter.get(None, [])
+            root_jobs = [submit_page_download(executor, client, p, out_root) for p in root_pages]
+
+            # Chapters and their pages
+            chapter_jobs: List[Tuple[Path, List[Tuple[str, Future]]]] = []
+            chapters = chapters_future.result()
+            for ch in chapters:
+                ch_title = ch.get("name") or f"Chapter-{ch.get('id')}"
+                ch_prio = ch.get("priority")
+                ch_dir = out_root / prefixed_name(ch_prio, ch_title)
+                ch_dir.mkdir(parents=True, exist_ok=True)
+
+                ch_pages = pages_by_chapter.get(ch["id"], [])
+                chapter_jobs.append((ch_dir, [submit_page_download(executor, client, p, ch_dir) for p in ch_pages]))
+
+            # Report in listing order; pages keep downloading in the background meanwhile
+            report_downloads(root_jobs, indent="")
+            for ch_dir, jobs in chapter_jobs:
+                print(f"[=] Chapter: {ch_dir.name}")
+                report_downloads(jobs, indent="    ")
+        except BaseException:
+            # Stop queued pages from downloading behind the error; only in-flight ones finish
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    save_md_cache(md_cache_path)
     print("[✓] Download complete.")
 
 if __name__ == "__main__":
@@ -3,7 +3,8 @@
 BookStack Content Sync (env-driven, folder-based) with:
 - Two-digit filename/folder prefixes used for ordering (not names)
 - Title derived ONLY from filename (prefix removed; case preserved)
-- Image inlining (Markdown image refs -> data URIs)
+- Local images uploaded to the BookStack image gallery and referenced by URL
+  (or inlined as data URIs with BOOKSTACK_INLINE_IMAGES=1)
 - Smart update: skip updating a page when content is unchanged; still update priority if needed
 
 Folder rules:
@@ -20,15 +21,30 @@ Optional:
   CONTENT_DIR=/path/to/content   (default: ./<BOOKSTACK_BOOK_NAME> next to script)
   BOOKSTACK_INSECURE=1           (disable TLS verify & suppress warnings)
   BOOKSTACK_CA_CERT=/path/to/ca.pem
+  BOOKSTACK_CONCURRENCY=8        (number of pages synced in parallel)
+  BOOKSTACK_INLINE_IMAGES=1      (inline images as data URIs instead of uploading)
+  BOOKSTACK_RESOLVE_SYMLINKS=1   (follow symlinks when resolving image paths)
+
+A local cache (.bookstack_sync_cache.json next to the script) remembers the
+content hash last synced to each page, so unchanged pages are skipped without
+fetching their body, and the gallery URL of each uploaded image, so it is
+uploaded once. Delete the file to force a full comparison and fresh uploads.
 """
 
 import os
 import re
 import sys
-import base64
+import json
+import stat
+import hashlib
+import fnmatch
+import tempfile
+import functools
 import mimetypes
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Callable, Optional, Dict, Any, List, Tuple
 
 # --- Load environment from .env if present ---
 try:
@@ -53,6 +69,24 @@ except ImportError:
     subprocess.check_call([_sys.executable, "-m", "pip", "install", "requests"])
     import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# pybase64 encodes with SIMD where the CPU supports it; the stdlib encoder is the fallback
+try:
+    from pybase64 import b64encode  # type: ignore
+except ImportError:
+    from base64 import b64encode
+
+# orjson when installed; json_dumps returns the request body as bytes either way
+try:
+    from orjson import loads as json_loads, dumps as json_dumps  # type: ignore
+except ImportError:
+    from json import loads as json_loads, dumps as _stdlib_dumps
+
+    def json_dumps(obj: Any) -> bytes:
+        return _stdlib_dumps(obj).encode("utf-8")
+
 
 # --------------------- Prefix & naming helpers ---------------------
 
@@ -78,16 +112,34 @@ def title_from_filename(filename: str) -> Tuple[int, str]:
 
 # --------------------- Markdown image inlining ---------------------
 
-MD_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)')
+# Matched against the UTF-8 bytes of a page, so large pages are scanned without str overhead
+MD_IMAGE_RE_BYTES = re.compile(rb'!\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)')
 IMG_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"}
 
+B64_CHUNK_SIZE = 48 * 1024  # multiple of 3, so per-chunk encodings concatenate cleanly
+
 def to_data_uri(path: Path) -> Optional[str]:
-    if not path.exists() or not path.is_file():
-        return None
     ext = path.suffix.lower()
     if ext not in IMG_EXTS:
         return None
-    mime, _ = mimetypes.guess_type(str(path))
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    # Keyed on mtime/size so an edited image is re-encoded
+    return _encode_data_uri(str(path), st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=256)
+def _encode_data_uri(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Encode an image file as a data URI, once per (path, mtime, size).
+    The file is read and base64-encoded in chunks so the raw bytes and the
+    encoded copy are never both held in full.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    mime, _ = mimetypes.guess_type(path)
     if not mime:
         mime = {
             ".png": "image/png",
@@ -97,30 +149,118 @@ def to_data_uri(path: Path) -> Optional[str]:
             ".webp": "image/webp",
             ".svg": "image/svg+xml",
         }.get(ext, "application/octet-stream")
-    data = path.read_bytes()
-    b64 = base64.b64encode(data).decode("ascii")
-    return f"data:{mime};base64,{b64}"
+    b64 = bytearray()
+    with open(path, "rb") as f:
+        while chunk := f.read(B64_CHUNK_SIZE):
+            b64 += b64encode(chunk)
+    return f"data:{mime};base64,{b64.decode('ascii')}"
+
+# Lexical normalisation is enough unless image folders are symlinked somewhere else
+RESOLVE_SYMLINKS = os.getenv("BOOKSTACK_RESOLVE_SYMLINKS", "0").lower() in ("1", "true", "yes")
+_resolved_images: Dict[Tuple[str, str, str], Optional[Path]] = {}
 
 def resolve_image(ref: str, page_dir: Path, content_root: Path) -> Optional[Path]:
-    cand = (page_dir / ref).resolve()
-    if cand.exists():
-        return cand
-    cand = (content_root / ref).resolve()
-    if cand.exists():
-        return cand
-    return None
+    key = (str(page_dir), str(content_root), ref)
+    if key in _resolved_images:
+        return _resolved_images[key]
+    found: Optional[Path] = None
+    for base in key[:2]:
+        cand = os.path.normpath(os.path.join(base, ref))
+        if os.path.isfile(cand):
+            found = Path(cand).resolve() if RESOLVE_SYMLINKS else Path(cand)
+            break
+    _resolved_images[key] = found
+    return found
+
+def rewrite_images(markdown: str, page_dir: Path, content_root: Path,
+                   target_for: Callable[[Path], Optional[str]]) -> str:
+    """
+    Point every local image reference at target_for(image path), leaving refs
+    it returns None for (or that don't resolve) unchanged. Each distinct ref is
+    resolved once; the output is joined from slices of the original bytes.
+    """
+    buf = markdown.encode("utf-8")
+    matches = list(MD_IMAGE_RE_BYTES.finditer(buf))
+    if not matches:
+        return markdown
+
+    targets: Dict[bytes, Optional[bytes]] = {}
+    for m in matches:
+        raw_ref = m.group(2)
+        if raw_ref not in targets:
+            img_path = resolve_image(raw_ref.decode("utf-8").replace("%20", " "), page_dir, content_root)
+            target = target_for(img_path) if img_path else None
+            targets[raw_ref] = target.encode("utf-8") if target else None
+    if not any(targets.values()):
+        return markdown
+
+    view = memoryview(buf)
+    parts: List[Any] = []
+    pos = 0
+    for m in matches:
+        target = targets[m.group(2)]
+        if target is None:
+            continue
+        start, end = m.span()
+        parts += (view[pos:start], b"![", m.group(1), b"](", target, b")")
+        pos = end
+    parts.append(view[pos:])
+    return b"".join(parts).decode("utf-8")
 
 def inline_images(markdown: str, page_dir: Path, content_root: Path) -> str:
-    def _replace(m: re.Match) -> str:
-        alt_text = m.group(1)
-        ref = m.group(2).replace("%20", " ")
-        img_path = resolve_image(ref, page_dir, content_root)
-        if img_path:
-            data_uri = to_data_uri(img_path)
-            if data_uri:
-                return f"![{alt_text}]({data_uri})"
-        return m.group(0)
-    return MD_IMAGE_RE.sub(_replace, markdown)
+    return rewrite_images(markdown, page_dir, content_root, to_data_uri)
+
+
+# --------------------- Markdown image uploads ---------------------
+
+@functools.lru_cache(maxsize=1024)
+def _file_sha1(path: str, mtime_ns: int, size: int) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(B64_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+# Types the BookStack image gallery accepts; others (SVG) are still inlined
+GALLERY_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
+# One lock per image so two pages sharing an image upload it only once
+_upload_locks_guard = threading.Lock()
+_upload_locks: Dict[str, threading.Lock] = {}
+
+def upload_image_once(client: "BookStackClient", page_id: Optional[int], img_path: Path,
+                      image_cache: Dict[str, str]) -> Optional[str]:
+    """
+    Return the gallery URL for a local image, uploading it (attached to page_id)
+    unless image_cache already has this path at this content hash.
+    With page_id None nothing is uploaded; uncached images give None.
+    """
+    if img_path.suffix.lower() not in GALLERY_EXTS:
+        return to_data_uri(img_path)
+    try:
+        st = img_path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    key = f"{img_path}:{_file_sha1(str(img_path), st.st_mtime_ns, st.st_size)}"
+    if page_id is None:
+        return image_cache.get(key)
+    with _upload_locks_guard:
+        lock = _upload_locks.setdefault(key, threading.Lock())
+    with lock:
+        url = image_cache.get(key)
+        if not url:
+            url = client.upload_image(page_id, img_path).get("url")
+            if url:
+                image_cache[key] = url
+    return url
+
+def link_images(client: "BookStackClient", markdown: str, page_id: Optional[int], page_dir: Path,
+                content_root: Path, image_cache: Dict[str, str]) -> str:
+    """Like inline_images(), but points each local image at its uploaded gallery URL."""
+    return rewrite_images(markdown, page_dir, content_root,
+                          lambda img_path: upload_image_once(client, page_id, img_path, image_cache))
 
 
 # --------------------- Content helpers ---------------------
@@ -228,8 +368,21 @@ def convert_callouts_to_html(md_text: str) -> str:
 
 # --------------------- API Client ---------------------
 
+class CreateSafeRetry(Retry):
+    """
+    Retry policy that re-sends a POST only on 429, where BookStack rejected the
+    request without processing it. A POST that got a 5xx or timed out may already
+    have created its page/chapter/image, so re-sending it could create a duplicate.
+    POST is left out of allowed_methods, so read errors are never retried for it.
+    """
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method.upper() == "POST":
+            return status_code == 429
+        return super().is_retry(method, status_code, has_retry_after)
+
+
 class BookStackClient:
-    def __init__(self, base_url: str, token_id: str, token_secret: str, verify=True, rate_limit_sleep: float = 0.5):
+    def __init__(self, base_url: str, token_id: str, token_secret: str, verify=True, rate_limit_sleep: float = 0.5, concurrency: int = 8):
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
         self.session.headers.update({
@@ -239,23 +392,35 @@ class BookStackClient:
             "User-Agent": "BookStack-FolderSync/1.4"
         })
         self.session.verify = verify
+        # Pool sized above the worker count so concurrent page syncs reuse connections.
+        # POSTs (creates/uploads) are only retried on 429, see CreateSafeRetry.
+        retry = CreateSafeRetry(
+            total=5,
+            backoff_factor=rate_limit_sleep,
+            backoff_jitter=rate_limit_sleep,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            allowed_methods=frozenset(["GET", "PUT"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.rate_limit_sleep = rate_limit_sleep
-
-    def _request(self, method: str, path: str, *, params: Dict[str, Any] = None, json: Dict[str, Any] = None) -> Dict[str, Any]:
-        import time as _time
-        url = f"{self.base_url}{path}"
-        for attempt in range(5):
-            resp = self.session.request(method, url, params=params, json=json, timeout=60)
-            if resp.status_code == 429:
-                _time.sleep(self.rate_limit_sleep * (attempt + 1))
-                continue
-            if 200 <= resp.status_code < 300:
-                return resp.json() if resp.text.strip() else {}
-            if 500 <= resp.status_code < 600 and attempt < 4:
-                _time.sleep(self.rate_limit_sleep * (attempt + 1))
-                continue
-            raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
-        raise RuntimeError(f"{method} {path} failed after retries")
+        self.concurrency = concurrency
+
+    def _request(self, method: str, path: str, *, params: Dict[str, Any] = None, json: Dict[str, Any] = None,
+                 data: Dict[str, Any] = None, files: Dict[str, Any] = None) -> Dict[str, Any]:
+        # Multipart uploads drop the session's JSON Content-Type so requests can set the boundary
+        headers = {"Content-Type": None} if files else None
+        if json is not None:
+            data = json_dumps(json)
+        resp = self.session.request(method, f"{self.base_url}{path}", params=params,
+                                    data=data, files=files, headers=headers, timeout=60)
+        if 200 <= resp.status_code < 300:
+            body = resp.content
+            return json_loads(body) if body and not body.isspace() else {}
+        raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
 
     # Books
     def find_book_exact(self, name: str) -> Optional[Dict[str, Any]]:
@@ -285,15 +450,25 @@ class BookStackClient:
         return self._request("PUT", f"/api/chapters/{chapter_id}", json=fields)
 
     # Pages
-    def find_page(self, *, book_id: int, chapter_id: Optional[int], name: str) -> Optional[Dict[str, Any]]:
-        params = {"filter[book_id]": book_id, "filter[name:like]": name, "count": 500}
-        if chapter_id:
-            params["filter[chapter_id]"] = chapter_id
-        data = self._request("GET", "/api/pages", params=params)
-        for p in data.get("data", []):
-            if p.get("name") == name and p.get("book_id") == book_id and (chapter_id is None or p.get("chapter_id") == chapter_id):
-                return p
-        return None
+    def list_pages_in_book(self, book_id: int) -> Dict[Tuple[int, str], Dict[str, Any]]:
+        """
+        Index every page of the book by (chapter_id or 0, name), paging through
+        /api/pages once instead of searching per page.
+        """
+        index: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        offset = 0
+        count = 500
+        while True:
+            params = {"filter[book_id]": book_id, "count": count, "offset": offset}
+            items = self._request("GET", "/api/pages", params=params).get("data", [])
+            for p in items:
+                if p.get("book_id") == book_id:
+                    # first match wins, as with the old per-page search
+                    index.setdefault((p.get("chapter_id") or 0, p.get("name")), p)
+            offset += len(items)
+            if len(items) < count:
+                break
+        return index
 
     def get_page(self, page_id: int) -> Dict[str, Any]:
         # Try to fetch markdown; some BookStack versions return 'markdown' by default.
@@ -313,14 +488,35 @@ class BookStackClient:
     def update_page(self, page_id: int, **fields) -> Dict[str, Any]:
         return self._request("PUT", f"/api/pages/{page_id}", json=fields)
 
+    # Images
+    def upload_image(self, page_id: int, path: Path) -> Dict[str, Any]:
+        mime, _ = mimetypes.guess_type(str(path))
+        with open(path, "rb") as f:
+            return self._request("POST", "/api/image-gallery",
+                                 data={"type": "gallery", "uploaded_to": page_id, "name": path.name},
+                                 files={"image": (path.name, f, mime or "application/octet-stream")})
+
+    def update_pages_bulk(self, updates: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Apply several (page_id, fields) updates at once. BookStack has no batch
+        endpoint, so the PUTs are issued in parallel over the pooled session.
+        Returns the updated pages in the same order.
+        """
+        if len(updates) <= 1:
+            return [self.update_page(page_id, **fields) for page_id, fields in updates]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(updates))) as executor:
+            return list(executor.map(lambda u: self.update_page(u[0], **u[1]), updates))
+
 
 # --------------------- Compare helpers ---------------------
 
-def render_markdown_to_html(md: str) -> Optional[str]:
-    """
-    Render Markdown to HTML for comparison fallback when 'markdown' is not returned by the API.
-    Returns None if we cannot render (package not available).
-    """
+# One Markdown instance per worker thread; Markdown objects are not thread-safe
+_md_local = threading.local()
+
+def _get_markdown_renderer():
+    md_instance = getattr(_md_local, "md", None)
+    if md_instance is not None:
+        return md_instance
     try:
         import markdown as mdlib  # type: ignore
     except Exception:
@@ -331,8 +527,20 @@ def render_markdown_to_html(md: str) -> Optional[str]:
             import markdown as mdlib  # type: ignore
         except Exception:
             return None
+    md_instance = mdlib.Markdown(extensions=[])
+    _md_local.md = md_instance
+    return md_instance
+
+def render_markdown_to_html(md: str) -> Optional[str]:
+    """
+    Render Markdown to HTML for comparison fallback when 'markdown' is not returned by the API.
+    Returns None if we cannot render (package not available).
+    """
+    md_instance = _get_markdown_renderer()
+    if md_instance is None:
+        return None
     # Basic rendering; BookStack's parser differs, but good enough for "no-change" heuristic
-    return mdlib.markdown(md, extensions=[])
+    return md_instance.reset().convert(md)
 
 def contents_equal(new_markdown: str, existing_page: Dict[str, Any]) -> bool:
     """
@@ -372,34 +580,243 @@ def collect_content(content_dir: Path) -> Tuple[
       - root_pages: [(order, display_title, file_path), ...]
       - chapters:   [(chapter_order, chapter_name, [(page_order, display_title, file_path), ...]), ...]
     """
-    root_pages: List[Tuple[int, str, Path]] = []
-    chapters: List[Tuple[int, str, List[Tuple[int, str, Path]]]] = []
-
-    # Root-level pages
-    for p in content_dir.glob("*.md"):
-        order, display = title_from_filename(p.name)
-        root_pages.append((order, display, p))
+    def sort_key(t: Tuple[int, str, Any]) -> Tuple[int, str]:
+        return t[0], t[1].lower()
+
+    def scan(directory: str) -> Tuple[List[Tuple[int, str, Path]], List[os.DirEntry]]:
+        # DirEntry caches the file type from the directory listing, so no stat per entry
+        pages: List[Tuple[int, str, Path]] = []
+        subdirs: List[os.DirEntry] = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subdirs.append(entry)
+                elif entry.is_file() and fnmatch.fnmatch(entry.name, "*.md"):
+                    order, display = title_from_filename(entry.name)
+                    pages.append((order, display, Path(entry.path)))
+        pages.sort(key=sort_key)
+        return pages, subdirs
+
+    # Root-level pages; chapters = first-level directories
+    root_pages, chapter_dirs = scan(str(content_dir))
 
-    # Chapters = first-level directories
-    chapter_dirs = [d for d in content_dir.iterdir() if d.is_dir()]
-    chapter_dirs.sort(key=lambda d: (strip_two_digit_prefix(d.name)[0], strip_two_digit_prefix(d.name)[1].lower()))
+    chapters: List[Tuple[int, str, List[Tuple[int, str, Path]]]] = []
     for sub in chapter_dirs:
         ch_order, ch_name = strip_two_digit_prefix(sub.name)
-        ch_name = ch_name if ch_name else sub.name
-        chapter_files = [f for f in sub.glob("*.md")]
-        chapter_files.sort(key=lambda f: (title_from_filename(f.name)[0], title_from_filename(f.name)[1].lower()))
-        page_items: List[Tuple[int, str, Path]] = []
-        for f in chapter_files:
-            p_order, p_name = title_from_filename(f.name)
-            page_items.append((p_order, p_name, f))
+        page_items, _ = scan(sub.path)
         if page_items:
-            chapters.append((ch_order, ch_name, page_items))
+            chapters.append((ch_order, ch_name if ch_name else sub.name, page_items))
 
-    root_pages.sort(key=lambda t: (t[0], t[1].lower()))
-    chapters.sort(key=lambda t: (t[0], t[1].lower()))
+    chapters.sort(key=sort_key)
     return root_pages, chapters
 
 
+# --------------------- Sync cache ---------------------
+
+SYNC_CACHE_FILE = ".bookstack_sync_cache.json"
+
+def load_sync_cache(path: Path, base_url: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    Return (pages, images) recorded by the last sync against this BookStack
+    instance (both empty if missing or for another host):
+      pages:  {page_id: {"md_sha256": ..., "updated_at": ...}}
+      images: {"<local path>:<sha1>": gallery URL}
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(data, dict) or data.get("base_url") != base_url:
+        return {}, {}
+    pages = data.get("pages")
+    images = data.get("images")
+    return (pages if isinstance(pages, dict) else {}), (images if isinstance(images, dict) else {})
+
+def save_sync_cache(path: Path, base_url: str, pages: Dict[str, Dict[str, Any]], images: Dict[str, str]) -> None:
+    """Write the cache via a temp file + os.replace, so an interrupted write never truncates it."""
+    data = json.dumps({"base_url": base_url, "pages": pages, "images": images}, indent=1).encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def remember_page(sync_cache: Dict[str, Dict[str, Any]], page: Dict[str, Any], md_sha256: str) -> None:
+    if page.get("id") is not None:
+        sync_cache[str(page["id"])] = {"md_sha256": md_sha256, "updated_at": page.get("updated_at")}
+
+
+# --------------------- Upserts ---------------------
+
+# A deferred priority-only page update: (page_id, fields, md_sha256)
+PriorityUpdate = Tuple[int, Dict[str, Any], str]
+
+def prepare_markdown(file_path: Path, content_root: Path, inline: bool) -> str:
+    """
+    Read a page file and apply the transforms that need no API access.
+    Callouts are converted later, in finish_markdown(), after image links are final.
+    """
+    transformed_md = read_markdown(file_path)
+    if inline:
+        transformed_md = inline_images(transformed_md, page_dir=file_path.parent, content_root=content_root)
+    return ensure_blankline_before_callouts(transformed_md)
+
+class ReadAhead:
+    """
+    Runs prepare_markdown() for the page files, in order, on a pool, staying at most
+    `window` files ahead of the pages that have taken their Markdown. Each take()
+    queues the next read, so only a bounded number of transformed pages are held at once.
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor, files: List[Path], content_root: Path,
+                 inline: bool, window: int):
+        self.pool = pool
+        self.files = files
+        self.content_root = content_root
+        self.inline = inline
+        self.window = window
+        self._jobs: Dict[int, Future] = {}
+        self._next = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        with self._lock:
+            self._fill(window - 1)
+
+    def _fill(self, upto: int) -> None:
+        while self._next <= upto and self._next < len(self.files):
+            self._jobs[self._next] = self.pool.submit(prepare_markdown, self.files[self._next],
+                                                      self.content_root, self.inline)
+            self._next += 1
+
+    def take(self, index: int) -> str:
+        """Wait for the index-th file's Markdown and hand it over (the reader keeps no copy)."""
+        with self._lock:
+            if self._closed:
+                raise CancelledError()
+            self._fill(index + self.window)
+            job = self._jobs.pop(index)
+        return job.result()
+
+    def close(self) -> None:
+        """Cancel the reads nobody has taken yet."""
+        with self._lock:
+            self._closed = True
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs.clear()
+
+def finish_markdown(client: BookStackClient, markdown: str, page_id: Optional[int], file_path: Path,
+                    content_root: Path, image_cache: Optional[Dict[str, str]]) -> str:
+    """
+    Point local images at their uploads (unless inlining) and convert callouts.
+    page_id None (page not created yet) links only the images uploaded before.
+    """
+    if image_cache is not None:
+        markdown = link_images(client, markdown, page_id, file_path.parent, content_root, image_cache)
+    return convert_callouts_to_html(markdown)
+
+def upsert_chapter(client: BookStackClient, book_id: int, chapter_name: str, chapter_order: int) -> Tuple[Dict[str, Any], str]:
+    """
+    Create the chapter or fix its order. Returns (chapter, log line).
+    """
+    chapter = client.find_chapter(book_id, chapter_name)
+    if not chapter:
+        chapter = client.create_chapter(book_id, chapter_name, description="", priority=chapter_order)
+        return chapter, f"[+] Creating chapter: {chapter_name}"
+    if chapter.get("priority") != chapter_order:
+        client.update_chapter(chapter["id"], priority=chapter_order)
+        return chapter, f"[~] Updating chapter order: {chapter_name} -> {chapter_order}"
+    return chapter, f"[=] Chapter order OK: {chapter_name}"
+
+def upsert_page(client: BookStackClient, book_id: int, chapter: Optional[Dict[str, Any]], page_title: str,
+                file_path: Path, load_markdown: Callable[[], str], priority: int, content_root: Path,
+                page_index: Dict[Tuple[int, str], Dict[str, Any]],
+                sync_cache: Dict[str, Dict[str, Any]],
+                image_cache: Optional[Dict[str, str]]) -> Tuple[str, Optional[PriorityUpdate]]:
+    """
+    Create or update one page (chapter=None for the book root). Returns the log line
+    and, when only the priority changed, the update to pass to flush_priority_updates().
+    load_markdown returns the page's prepare_markdown() output, from the ReadAhead;
+    page_index is the book's existing pages from list_pages_in_book();
+    sync_cache is updated with the hash of what the page now holds;
+    image_cache maps uploaded images to their URLs (None when inlining images).
+    """
+    prepared_md = load_markdown()
+    chapter_id = chapter["id"] if chapter else None
+    if chapter is None:
+        indent, where, label = "", " (book root)", page_title
+    else:
+        indent, where, label = "    ", "", f"{chapter['name']} / {page_title}"
+
+    existing = page_index.get((chapter_id or 0, page_title))
+    if not existing:
+        # Gallery images are attached to a page, so the page has to exist before its uploads.
+        # Images uploaded on earlier runs are linked straight away; the follow-up update is
+        # only sent when some still had to be uploaded.
+        draft_md = finish_markdown(client, prepared_md, None, file_path, content_root, image_cache)
+        created = client.create_page(book_id=book_id, chapter_id=chapter_id, name=page_title, markdown=draft_md, priority=priority)
+        transformed_md = finish_markdown(client, prepared_md, created["id"], file_path, content_root, image_cache)
+        if transformed_md != draft_md:
+            created = client.update_page(created["id"], markdown=transformed_md)
+        remember_page(sync_cache, created, hashlib.sha256(transformed_md.encode("utf-8")).hexdigest())
+        return f"{indent}[+] Creating page{where}: {label}", None
+
+    transformed_md = finish_markdown(client, prepared_md, existing["id"], file_path, content_root, image_cache)
+    md_sha256 = hashlib.sha256(transformed_md.encode("utf-8")).hexdigest()
+
+    # Same hash as our last sync and nobody touched the page since: skip the body fetch,
+    # the listing's priority is all we need to compare
+    cached = sync_cache.get(str(existing["id"]))
+    if (cached and cached.get("md_sha256") == md_sha256
+            and cached.get("updated_at") == existing.get("updated_at")):
+        if existing.get("priority") != priority:
+            return (f"{indent}[~] No content change; updating priority only: {page_title} -> {priority}",
+                    (existing["id"], {"priority": priority}, md_sha256))
+        return f"{indent}[=] No change: {label}", None
+
+    # fetch full page for content comparison
+    full = client.get_page(existing["id"])
+    if contents_equal(transformed_md, full):
+        # content is the same; update only if priority changed
+        if existing.get("priority") != priority:
+            return (f"{indent}[~] No content change; updating priority only: {page_title} -> {priority}",
+                    (existing["id"], {"priority": priority}, md_sha256))
+        remember_page(sync_cache, existing, md_sha256)
+        return f"{indent}[=] No change: {label}", None
+
+    updated = client.update_page(existing["id"], markdown=transformed_md, priority=priority)
+    remember_page(sync_cache, updated, md_sha256)
+    return f"{indent}[=] Updating page{where}: {label}", None
+
+def flush_priority_updates(client: BookStackClient, pending: List[PriorityUpdate],
+                           sync_cache: Dict[str, Dict[str, Any]]) -> None:
+    """Send the collected priority-only updates in one batch and record them in sync_cache."""
+    if not pending:
+        return
+    updated_pages = client.update_pages_bulk([(page_id, fields) for page_id, fields, _ in pending])
+    for updated, (_, _, md_sha256) in zip(updated_pages, pending):
+        remember_page(sync_cache, updated, md_sha256)
+
+def report_pages(client: BookStackClient, jobs: List[Future],
+                 sync_cache: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Print each page's log line in order, then flush the priority updates they deferred.
+    The flush also runs when a later page fails, so every "[~]" line printed is applied.
+    """
+    pending: List[PriorityUpdate] = []
+    try:
+        for job in jobs:
+            line, priority_update = job.result()
+            print(line)
+            if priority_update:
+                pending.append(priority_update)
+    finally:
+        flush_priority_updates(client, pending, sync_cache)
+
+
 # --------------------- Main Sync ---------------------
 
 def main():
@@ -433,7 +850,8 @@ def main():
         sys.exit(2)
 
     # Connect API
-    client = BookStackClient(base_url, token_id, token_secret, verify=verify)
+    concurrency = max(1, int(os.getenv("BOOKSTACK_CONCURRENCY", "8")))
+    client = BookStackClient(base_url, token_id, token_secret, verify=verify, concurrency=concurrency)
 
     # Verify book exists
     book = client.find_book_exact(book_name)
@@ -447,74 +865,59 @@ def main():
     # Collect content
     root_pages, chapters = collect_content(content_root)
 
-    # ----- Upsert root-level pages -----
-    priority = 1
-    for _, page_title, file_path in root_pages:
-        raw_md = read_markdown(file_path)
-        transformed_md = inline_images(raw_md, page_dir=file_path.parent, content_root=content_root)
-        transformed_md = ensure_blankline_before_callouts(transformed_md)
-        transformed_md = convert_callouts_to_html(transformed_md)
-
-        existing = client.find_page(book_id=book_id, chapter_id=None, name=page_title)
-        if not existing:
-            print(f"[+] Creating page (book root): {page_title}")
-            client.create_page(book_id=book_id, chapter_id=None, name=page_title, markdown=transformed_md, priority=priority)
-        else:
-            # fetch full page for content comparison
-            full = client.get_page(existing["id"])
-            same = contents_equal(transformed_md, full)
-            if same:
-                # content is the same; update only if priority changed
-                if existing.get("priority") != priority:
-                    print(f"[~] No content change; updating priority only: {page_title} -> {priority}")
-                    client.update_page(existing["id"], priority=priority)
-                else:
-                    print(f"[=] No change: {page_title}")
-            else:
-                print(f"[=] Updating page (book root): {page_title}")
-                client.update_page(existing["id"], markdown=transformed_md, priority=priority)
-        priority += 1
-
-    # ----- Upsert chapters & their pages -----
-    chapter_order = 1
-    for ch_order, chapter_name, page_items in chapters:
-        chapter = client.find_chapter(book_id, chapter_name)
-        if not chapter:
-            print(f"[+] Creating chapter: {chapter_name}")
-            chapter = client.create_chapter(book_id, chapter_name, description="", priority=chapter_order)
-        else:
-            if chapter.get("priority") != chapter_order:
-                print(f"[~] Updating chapter order: {chapter_name} -> {chapter_order}")
-                client.update_chapter(chapter["id"], priority=chapter_order)
-            else:
-                print(f"[=] Chapter order OK: {chapter_name}")
-        chapter_order += 1
-
-        page_order = 1
-        for _, page_title, file_path in page_items:
-            raw_md = read_markdown(file_path)
-            transformed_md = inline_images(raw_md, page_dir=file_path.parent, content_root=content_root)
-            transformed_md = ensure_blankline_before_callouts(transformed_md)
-            transformed_md = convert_callouts_to_html(transformed_md)
-
-            existing = client.find_page(book_id=book_id, chapter_id=chapter["id"], name=page_title)
-            if not existing:
-                print(f"    [+] Creating page: {chapter_name} / {page_title}")
-                client.create_page(book_id=book_id, chapter_id=chapter["id"], name=page_title, markdown=transformed_md, priority=page_order)
-            else:
-                full = client.get_page(existing["id"])
-                same = contents_equal(transformed_md, full)
-                if same:
-                    if existing.get("priority") != page_order:
-                        print(f"    [~] No content change; updating priority only: {page_title} -> {page_order}")
-                        client.update_page(existing["id"], priority=page_order)
-                    else:
-                        print(f"    [=] No change: {chapter_name} / {page_title}")
-                else:
-                    print(f"    [=] Updating page: {chapter_name} / {page_title}")
-                    client.update_page(existing["id"], markdown=transformed_md, priority=page_order)
-            page_order += 1
+    # Existing pages, fetched once for the whole book
+    page_index = client.list_pages_in_book(book_id)
+    sync_cache_path = script_dir / SYNC_CACHE_FILE
+    sync_cache, image_cache = load_sync_cache(sync_cache_path, client.base_url)
+    inline = os.getenv("BOOKSTACK_INLINE_IMAGES", "0").lower() in ("1", "true", "yes")
+    page_image_cache = None if inline else image_cache
 
+    # Saved even if a page fails, so images already uploaded are not uploaded again.
+    # Leaving the pools waits for in-flight pages, so the caches are settled by then.
+    try:
+        # File reads and Markdown transforms run in their own pool, a bounded window ahead
+        # of the uploads, so disk I/O overlaps the chapter calls and the page uploads below
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as reader, \
+                ThreadPoolExecutor(max_workers=concurrency) as executor:
+            page_files = [file_path for _, _, file_path in root_pages]
+            page_files += [file_path for _, _, page_items in chapters for _, _, file_path in page_items]
+            reads = ReadAhead(reader, page_files, content_root, inline, window=2 * concurrency)
+            try:
+                # ----- Upsert root-level pages -----
+                root_jobs = [
+                    executor.submit(upsert_page, client, book_id, None, page_title, file_path,
+                                    functools.partial(reads.take, priority - 1), priority,
+                                    content_root, page_index, sync_cache, page_image_cache)
+                    for priority, (_, page_title, file_path) in enumerate(root_pages, start=1)
+                ]
+
+                # ----- Upsert chapters & their pages -----
+                # Chapters are created up front (serially) so their pages know the chapter id
+                chapter_jobs: List[Tuple[str, List[Future]]] = []
+                read_offset = len(root_pages)
+                for chapter_order, (_, chapter_name, page_items) in enumerate(chapters, start=1):
+                    chapter, chapter_line = upsert_chapter(client, book_id, chapter_name, chapter_order)
+                    chapter_jobs.append((chapter_line, [
+                        executor.submit(upsert_page, client, book_id, chapter, page_title, file_path,
+                                        functools.partial(reads.take, read_offset + page_order - 1), page_order,
+                                        content_root, page_index, sync_cache, page_image_cache)
+                        for page_order, (_, page_title, file_path) in enumerate(page_items, start=1)
+                    ]))
+                    read_offset += len(page_items)
+
+                # Report in content order; pages keep syncing in the background meanwhile.
+                # Priority-only updates are flushed together once per chapter (and for the root).
+                report_pages(client, root_jobs, sync_cache)
+                for chapter_line, jobs in chapter_jobs:
+                    print(chapter_line)
+                    report_pages(client, jobs, sync_cache)
+            except BaseException:
+                # Stop queued pages from syncing behind the error; only in-flight ones finish
+                executor.shutdown(wait=False, cancel_futures=True)
+                reads.close()
+                raise
+    finally:
+        save_sync_cache(sync_cache_path, client.base_url, sync_cache, image_cache)
     print("[✓] Sync complete.")
 
 if __name__ == "__main__":
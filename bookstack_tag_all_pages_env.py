@@ -6,14 +6,15 @@ Update all pages in a BookStack book to set a tag.
 - Loads BookStack credentials from .env or environment variables.
 - TLS handled by BOOKSTACK_INSECURE=1 or BOOKSTACK_CA_CERT=/path/to/ca.pem.
 - Dry run option: BOOKSTACK_DRY_RUN=1 (shows what would happen).
+- Pages are processed in parallel: BOOKSTACK_CONCURRENCY=8 (default).
 
 The tag is defined below as GLOBAL variables (not from env).
 """
 
 import os
 import sys
-import time
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
 
 # ---------------- Tag Config -----------------
 TAG_NAME = "Status"
@@ -42,7 +43,19 @@ except ImportError:
     subprocess.check_call([_sys.executable, "-m", "pip", "install", "requests"])
     import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads, dumps as json_dumps  # type: ignore
+except ImportError:
+    from json import loads as json_loads, dumps as _stdlib_dumps
+
+    def json_dumps(obj: Any) -> bytes:
+        return _stdlib_dumps(obj).encode("utf-8")
+
 DRY_RUN = os.getenv("BOOKSTACK_DRY_RUN", "0").lower() in ("1","true","yes")
+CONCURRENCY = max(1, int(os.getenv("BOOKSTACK_CONCURRENCY", "8")))
 
 BASE_URL = os.getenv("BOOKSTACK_BASE_URL")
 TOKEN_ID = os.getenv("BOOKSTACK_TOKEN_ID")
@@ -71,21 +84,28 @@ session.headers.update({
     "User-Agent": "BookStack-TagUpdater/1.1-fixed"
 })
 session.verify = verify
+# Only GET and PUT are sent, both safe to retry
+_retry = Retry(
+    total=5,
+    backoff_factor=0.5,
+    backoff_jitter=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+    allowed_methods=frozenset(["GET", "PUT"]),
+    raise_on_status=False,
+)
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=_retry)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
 
 def req(method: str, path: str, *, params=None, json=None) -> Dict[str, Any]:
     url = f"{BASE_URL.rstrip('/')}{path}"
-    for attempt in range(5):
-        resp = session.request(method, url, params=params, json=json, timeout=30)
-        if resp.status_code == 429:
-            time.sleep(0.5 * (attempt + 1))
-            continue
-        if 200 <= resp.status_code < 300:
-            return resp.json() if resp.text.strip() else {}
-        if 500 <= resp.status_code < 600 and attempt < 4:
-            time.sleep(0.5 * (attempt + 1))
-            continue
-        raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
-    raise RuntimeError(f"{method} {path} failed after retries")
+    data = json_dumps(json) if json is not None else None
+    resp = session.request(method, url, params=params, data=data, timeout=30)
+    if 200 <= resp.status_code < 300:
+        body = resp.content
+        return json_loads(body) if body and not body.isspace() else {}
+    raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
 
 def find_book_exact(name: str) -> Optional[Dict[str, Any]]:
     data = req("GET", "/api/books", params={"filter[name:like]": name, "count": 500})
@@ -99,7 +119,8 @@ def iter_pages(book_id: Optional[int] = None):
     offset = 0
     count = 100
     while True:
-        params = {"count": count, "offset": offset}
+        # Instances that honour include=tags save a per-page GET in tag_page()
+        params = {"count": count, "offset": offset, "include": "tags"}
         if book_id is not None:
             params["filter[book_id]"] = book_id
         data = req("GET", "/api/pages", params=params)
@@ -140,6 +161,11 @@ def update_page_tags(page: Dict[str, Any]) -> bool:
     req("PUT", f"/api/pages/{page['id']}", json=body)
     return True
 
+def tag_page(page: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Fetch one page (unless the listing carried its tags) and upsert the tag on it. Runs in a worker thread."""
+    full = page if "tags" in page else get_page(page["id"])
+    return full, update_page_tags(full)
+
 def main():
     book = find_book_exact(BOOK_NAME)
     if not book:
@@ -150,14 +176,15 @@ def main():
 
     updated = 0
     checked = 0
-    for p in iter_pages(book_id=book_id):
-        checked += 1
-        full = get_page(p["id"])
-        if update_page_tags(full):
-            updated += 1
-            print(f"[+] Tagged page: {full.get('name')} (id={full.get('id')}) -> {TAG_NAME}={TAG_VALUE}")
-        else:
-            print(f"[=] No change: {full.get('name')} (id={full.get('id')})")
+    # Results come back in listing order, whatever order the workers finish in
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        for full, changed in executor.map(tag_page, iter_pages(book_id=book_id)):
+            checked += 1
+            if changed:
+                updated += 1
+                print(f"[+] Tagged page: {full.get('name')} (id={full.get('id')}) -> {TAG_NAME}={TAG_VALUE}")
+            else:
+                print(f"[=] No change: {full.get('name')} (id={full.get('id')})")
 
     print(f"[✓] Done. Checked {checked} page(s); updated {updated}.")
 
@@ -10,13 +10,16 @@ Uses the SAME env-driven connection settings as the sync script:
   Optional:
     BOOKSTACK_INSECURE=1         (disable TLS verify & suppress warnings)
     BOOKSTACK_CA_CERT=/path/to/ca.pem
+    BOOKSTACK_CONCURRENCY=8      (parallel requests when fetching user details)
     OUTPUT=bookstack_users_by_role.csv
 """
 
 import os
 import sys
 import csv
-from typing import Dict, Any, List, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List
 
 # --- Optional .env support (same as your script) ---
 try:
@@ -33,6 +36,14 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
     import requests
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads  # type: ignore
+except ImportError:
+    from json import loads as json_loads
+
 def getenv_required(key: str) -> str:
     v = os.getenv(key)
     if not v:
@@ -41,7 +52,7 @@ def getenv_required(key: str) -> str:
     return v
 
 class BookStackClient:
-    def __init__(self, base_url: str, token_id: str, token_secret: str, verify=True, rate_limit_sleep: float = 0.5):
+    def __init__(self, base_url: str, token_id: str, token_secret: str, verify=True, rate_limit_sleep: float = 0.5, concurrency: int = 8):
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
         self.session.headers.update({
@@ -50,50 +61,53 @@ class BookStackClient:
             "User-Agent": "BookStack-UsersByRole/1.0"
         })
         self.session.verify = verify
+        retry = Retry(
+            total=5,
+            backoff_factor=rate_limit_sleep,
+            backoff_jitter=rate_limit_sleep,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.rate_limit_sleep = rate_limit_sleep
+        self.concurrency = concurrency
 
     def _request(self, method: str, path: str, *, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        import time as _time
-        url = f"{self.base_url}{path}"
-        for attempt in range(5):
-            resp = self.session.request(method, url, params=params, timeout=60)
-            if resp.status_code == 429:
-                _time.sleep(self.rate_limit_sleep * (attempt + 1))
-                continue
-            if 200 <= resp.status_code < 300:
-                return resp.json() if resp.text.strip() else {}
-            if 500 <= resp.status_code < 600 and attempt < 4:
-                _time.sleep(self.rate_limit_sleep * (attempt + 1))
-                continue
-            raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
-        raise RuntimeError(f"{method} {path} failed after retries")
-
-    def list_users(self, count: int = 100) -> list[dict]:
-        users, page = [], 1
-        while True:
-            j = self._request("GET", "/api/users",
-                            params={"count": count, "page": page, "include": "roles"})
-            data = j.get("data", [])
-            print(f"[=] Fetched page {page} ({len(data)} users)")
-            if not data:
-                break
-            users.extend(data)
-
-            if len(data) < count or not j.get("next"):
-                break
-            page += 1
-
-        # Fallback enrich: if roles look empty, fetch details per user
-        need_enrich = any(u.get("roles") in (None, [],) for u in users)
-        if need_enrich:
-            print("[~] Roles empty for some users; enriching from /api/users/{id} …")
-            enriched = []
-            for u in users:
-                ud = self._request("GET", f"/api/users/{u['id']}")
-                u["roles"] = ud.get("roles", u.get("roles", []))
-                enriched.append(u)
-            users = enriched
-        return users
+        resp = self.session.request(method, f"{self.base_url}{path}", params=params, timeout=60)
+        if 200 <= resp.status_code < 300:
+            body = resp.content
+            return json_loads(body) if body and not body.isspace() else {}
+        raise RuntimeError(f"{method} {path} failed [{resp.status_code}]: {resp.text}")
+
+    def iter_users(self, count: int = 100) -> Iterator[Dict[str, Any]]:
+        """Yield users one listing page at a time, with roles filled in."""
+        offset, page = 0, 1
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                j = self._request("GET", "/api/users",
+                                params={"count": count, "offset": offset, "include": "roles"})
+                data = j.get("data", [])
+                print(f"[=] Fetched page {page} ({len(data)} users)")
+                if not data:
+                    break
+
+                # Fallback enrich: if roles look empty, fetch details for those users
+                missing = [u for u in data if u.get("roles") in (None, [],)]
+                if missing:
+                    print("[~] Roles empty for some users; enriching from /api/users/{id} …")
+                    details = executor.map(lambda u: self._request("GET", f"/api/users/{u['id']}"), missing)
+                    for u, ud in zip(missing, details):
+                        u["roles"] = ud.get("roles", u.get("roles", []))
+                yield from data
+
+                offset += len(data)
+                if len(data) < count:
+                    break
+                page += 1
 
 
 def main():
@@ -117,50 +131,46 @@ def main():
         except Exception:
             pass
 
-    client = BookStackClient(base_url, token_id, token_sec, verify=verify)
-
-    users = client.list_users()
-
-    # Flatten to role rows (one row per (role,user)); handle users with no roles
-    rows: List[Dict[str, Any]] = []
-    for u in users:
+    concurrency = max(1, int(os.getenv("BOOKSTACK_CONCURRENCY", "8")))
+    client = BookStackClient(base_url, token_id, token_sec, verify=verify, concurrency=concurrency)
+
+    # Bucket role rows (one row per (role,user)) as users arrive; handle users with no roles
+    buckets: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for u in client.iter_users():
+        row = {
+            "User Name": u.get("name", ""),
+            "Email": u.get("email", ""),
+            "User ID": u.get("id", ""),
+        }
         roles = (u.get("roles") or [])
-        if roles:
-            for r in roles:
-                rows.append({
-                    "Role": r.get("display_name") or r.get("name") or str(r.get("id")),
-                    "User Name": u.get("name", ""),
-                    "Email": u.get("email", ""),
-                    "User ID": u.get("id", ""),
-                })
-        else:
-            rows.append({
-                "Role": "(No role)",
-                "User Name": u.get("name", ""),
-                "Email": u.get("email", ""),
-                "User ID": u.get("id", ""),
-            })
-
-    # Sort by role then name
-    rows.sort(key=lambda r: ((r["Role"] or "").lower(), (r["User Name"] or "").lower()))
+        for r in roles:
+            role = r.get("display_name") or r.get("name") or str(r.get("id"))
+            buckets[role].append(dict(row, Role=role))
+        if not roles:
+            buckets["(No role)"].append(dict(row, Role="(No role)"))
+
+    # Sort by role then name; each bucket is sorted on its own
+    ordered_roles = sorted(buckets, key=lambda role: (role.lower(), role))
+    for role in ordered_roles:
+        buckets[role].sort(key=lambda r: (r["User Name"] or "").lower())
 
     # Write CSV
+    row_count = 0
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=["Role", "User Name", "Email", "User ID"])
         writer.writeheader()
-        writer.writerows(rows)
+        for role in ordered_roles:
+            writer.writerows(buckets[role])
+            row_count += len(buckets[role])
 
-    print(f"[✓] Wrote {out_path} (rows: {len(rows)})")
+    print(f"[✓] Wrote {out_path} (rows: {row_count})")
 
     # Pretty grouped summary to console
     print("\n=== Summary (grouped by role) ===")
-    last_role: Optional[str] = None
-    for r in rows:
-        role = r["Role"]
-        if role != last_role:
-            print(f"\n-- {role} --")
-            last_role = role
-        print(f"  {r['User Name']}  <{r['Email']}>")
+    for role in ordered_roles:
+        print(f"\n-- {role} --")
+        for r in buckets[role]:
+            print(f"  {r['User Name']}  <{r['Email']}>")
 
 if __name__ == "__main__":
     try: